@@ -110,6 +110,10 @@ class Settings(BaseSettings):
     # HTTP request timeout
     http_request_timeout_seconds: int = Field(default=30, ge=1)  # 30 seconds for outbound HTTP requests
 
+    # Parallel lstat calls for get_staging_info (0 = sequential); set to 8-16
+    # when data_dir is on a network filesystem where each stat is a round trip
+    staging_stat_workers: int = Field(default=0, ge=0, le=16)
+
     # Policies
     limits: SandboxLimits = Field(default_factory=SandboxLimits)
     parser_limits: ParserLimits = Field(default_factory=ParserLimits)
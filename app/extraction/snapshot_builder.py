@@ -16,7 +16,7 @@ from pathlib import Path
 import json
 
 from app.logging.logger import get_logger
-from app.storage.snapshot_repo import SnapshotRepository
+from app.storage.snapshot_repo import get_snapshot_repo
 
 
 class SnapshotBuilderError(Exception):
@@ -31,7 +31,7 @@ class SnapshotBuilder:
         """
         self.master_schema = master_schema
         self.logger = get_logger("extraction.snapshot_builder")
-        self.snapshot_repo = SnapshotRepository()
+        self.snapshot_repo = get_snapshot_repo()
         
         # Template directory path
         self.templates_dir = Path("app/schemas/snapshot_templates")
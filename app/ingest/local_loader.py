@@ -18,6 +18,8 @@ Security:
 
 from __future__ import annotations
 
+import functools
+import os
 import shutil
 from pathlib import Path
 from typing import List, Set
@@ -296,33 +298,75 @@ def get_project_staging_path(project_id: str) -> Path:
     Returns:
         Path to project staging directory (staging/{project_id}/)
     """
+    return _ensure_project_staging(project_id)
+
+
+@functools.lru_cache(maxsize=256)
+def _ensure_project_staging(project_id: str) -> Path:
+    """
+    Build and create staging/{project_id}/ once per project.
+
+    Cleared by delete_project_staging(), so the directory is recreated
+    on the next lookup after a delete.
+    """
     settings = get_settings()
     staging_path = settings.data_dir / "staging" / project_id
     staging_path.mkdir(parents=True, exist_ok=True)
     return staging_path
 
 
-def delete_project_staging(project_id: str) -> None:
+def delete_project_staging(project_id: str) -> int:
     """
     Delete project staging area.
     
     Called during project deletion to clean up staging files.
+    Files are counted while deleting, in the same single bottom-up walk.
     
     Args:
         project_id: Project identifier
-    """
-    import shutil
     
+    Returns:
+        Number of files deleted
+    """
     settings = get_settings()
     logger = get_logger("ingest.local")
     
     staging_path = settings.data_dir / "staging" / project_id
     
-    if staging_path.exists():
-        shutil.rmtree(staging_path)
-        logger.info(f"Deleted project staging: {staging_path}")
-    else:
-        logger.debug(f"Project staging does not exist: {staging_path}")
+    try:
+        # Security: never walk through a symlinked staging dir
+        if staging_path.is_symlink():
+            staging_path.unlink()
+            logger.warning(f"Removed symlinked project staging: {staging_path}")
+            return 0
+    
+        if not staging_path.exists():
+            logger.debug(f"Project staging does not exist: {staging_path}")
+            return 0
+    
+        file_count = 0
+    
+        for root, dirs, names in os.walk(staging_path, topdown=False):
+            for name in names:
+                os.unlink(os.path.join(root, name))
+            file_count += len(names)
+        
+            for name in dirs:
+                path = os.path.join(root, name)
+                # Symlinked dirs are listed but not descended into
+                if os.path.islink(path):
+                    os.unlink(path)
+                else:
+                    os.rmdir(path)
+    
+        os.rmdir(staging_path)
+        logger.info(f"Deleted project staging: {staging_path} ({file_count} files)")
+    
+        return file_count
+    finally:
+        # Cleared after the delete, so a lookup racing it cannot leave a
+        # cached path to a directory that no longer exists
+        _ensure_project_staging.cache_clear()
 
 
 def cleanup_project_staging_files(project_id: str, max_age_hours: int = 36) -> int:
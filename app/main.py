@@ -12,8 +12,9 @@ Multi-parser architecture:
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import yaml
 import json
@@ -36,7 +37,7 @@ from app.parsers.text_extractor import extract_text
 from app.parsers.csv_parser import parse_csv_file
 from app.extraction.field_mapper import FieldMapper
 from app.extraction.snapshot_builder import SnapshotBuilder
-from app.storage.snapshot_repo import SnapshotRepository
+from app.storage.snapshot_repo import get_snapshot_repo
 from app.storage.db import get_engine
 
 
@@ -50,6 +51,14 @@ _snapshot_builder: Optional[SnapshotBuilder] = None
 _startup_lock = threading.Lock()
 _logger = get_logger("main")
 
+# Parsed project manifests, LRU-ordered: project_id -> (file stamp, manifest).
+# The stamp is (mtime_ns, size, inode) of project_manifest.json, so a rewrite
+# by process_project invalidates the entry; nothing expires on a timer.
+_MANIFEST_CACHE_MAX_BYTES = 16 * 1024 * 1024
+_manifest_cache: "OrderedDict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]]" = OrderedDict()
+_manifest_cache_bytes = 0
+_manifest_cache_lock = threading.Lock()
+
 
 def startup() -> None:
     """Initialize sandbox tool: load schema, validate parsers, ensure DB tables."""
@@ -318,7 +327,7 @@ def _parse_file_multi_parser(route: FileRoute) -> Dict[str, Dict[str, Any]]:
 
 def delete_project(project_id: str) -> None:
     """Delete all snapshots for project."""
-    repo = SnapshotRepository()
+    repo = get_snapshot_repo()
     deleted = repo.delete_by_project(project_id)
     
     settings = get_settings()
@@ -346,15 +355,65 @@ def get_project_notebook(project_id: str, vendor_id: str) -> Dict[str, Any]:
 
 
 def get_project_manifest(project_id: str) -> Dict[str, Any]:
-    """Retrieve project manifest."""
+    """
+    Retrieve project manifest.
+
+    Parsed manifests are cached until the file changes on disk; treat the
+    returned dict as read-only.
+    """
+    return get_project_manifest_versioned(project_id)[1]
+
+
+def get_project_manifest_versioned(
+    project_id: str,
+    if_version: Optional[str] = None,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Retrieve project manifest together with its version token.
+
+    The version is opaque and changes whenever project_manifest.json is
+    rewritten. When it equals if_version the manifest is not loaded and
+    None is returned in its place.
+    """
+    global _manifest_cache_bytes
+
     settings = get_settings()
     path = settings.data_dir / "projects" / project_id / "project_manifest.json"
 
-    if not path.exists():
+    try:
+        st = path.stat()
+    except FileNotFoundError:
         raise SandboxToolError(f"Manifest not found: {project_id}")
 
+    stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+    version = "%x-%x-%x" % stamp
+
+    if version == if_version:
+        return version, None
+
+    with _manifest_cache_lock:
+        cached = _manifest_cache.get(project_id)
+        if cached is not None and cached[0] == stamp:
+            _manifest_cache.move_to_end(project_id)
+            return version, cached[1]
+
     with open(path) as f:
-        return json.load(f)
+        manifest = json.load(f)
+
+    with _manifest_cache_lock:
+        previous = _manifest_cache.pop(project_id, None)
+        if previous is not None:
+            _manifest_cache_bytes -= previous[0][1]
+
+        if st.st_size <= _MANIFEST_CACHE_MAX_BYTES:
+            _manifest_cache[project_id] = (stamp, manifest)
+            _manifest_cache_bytes += st.st_size
+
+            while _manifest_cache_bytes > _MANIFEST_CACHE_MAX_BYTES:
+                _, (evicted_stamp, _) = _manifest_cache.popitem(last=False)
+                _manifest_cache_bytes -= evicted_stamp[1]
+
+    return version, manifest
 
 
 def get_metrics() -> Dict[str, Any]:
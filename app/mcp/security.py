@@ -8,7 +8,11 @@ for all staging operations exposed via MCP tools.
 
 from __future__ import annotations
 
+import functools
+import itertools
+import os
 import re
+import stat
 from pathlib import Path
 from typing import List
 
@@ -37,6 +41,15 @@ VALID_FILENAME = re.compile(r'^[a-zA-Z0-9._-][a-zA-Z0-9._/-]{0,254}$')
 # Forbidden patterns in any path component
 FORBIDDEN_PATTERNS = ['..', '\x00', '~', ':', '*', '?', '"', '<', '>', '|']
 
+# All forbidden patterns folded into one regex so a filename is scanned once
+_FORBIDDEN_RE = re.compile('|'.join(re.escape(p) for p in FORBIDDEN_PATTERNS))
+
+# Bound matchers for the per-upload hot path
+_VALID_PROJECT_ID_MATCH = VALID_PROJECT_ID.match
+_VALID_FILENAME_MATCH = VALID_FILENAME.match
+_FORBIDDEN_SEARCH = _FORBIDDEN_RE.search
+
+
 # Reserved names (Windows)
 RESERVED_NAMES = {
     'con', 'prn', 'aux', 'nul',
@@ -44,6 +57,105 @@ RESERVED_NAMES = {
     'lpt1', 'lpt2', 'lpt3', 'lpt4', 'lpt5', 'lpt6', 'lpt7', 'lpt8', 'lpt9',
 }
 
+# Reserved names are all 3-4 chars; the length check rejects almost every
+# component before the case-insensitive match runs
+_RESERVED_LENS = frozenset(len(name) for name in RESERVED_NAMES)
+_RESERVED_MATCH = re.compile(
+    '(?:' + '|'.join(sorted(RESERVED_NAMES)) + r')\Z', re.IGNORECASE
+).match
+
+
+def _is_reserved_name(name: str) -> bool:
+    """Check if name is a reserved (Windows) device name, ignoring case."""
+    return len(name) in _RESERVED_LENS and _RESERVED_MATCH(name) is not None
+
+
+# GitHub repository URL: https://github.com/{owner}/{repo}[.git][/]
+_GITHUB_URL_MATCH = re.compile(
+    r'https://github\.com/[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+/?\Z'
+).match
+
+# The 12 snapshot categories accepted by validate_snapshot_type()
+_VALID_SNAPSHOT_TYPES = frozenset({
+    'file_metadata', 'imports', 'exports', 'functions', 'classes',
+    'connections', 'repo_metadata', 'security', 'quality',
+    'doc_metadata', 'doc_content', 'doc_analysis'
+})
+_VALID_SNAPSHOT_TYPES_STR = ', '.join(sorted(_VALID_SNAPSHOT_TYPES))
+
+# Dotfiles allowed even though they look like hidden directories
+ALLOWED_DOTFILES = ('.gitignore', '.gitattributes')
+
+
+def _build_filename_re() -> re.Pattern:
+    """
+    Compile VALID_FILENAME plus the per-component rules into one pattern.
+
+    Each component is non-empty, not a reserved name, and not a hidden
+    directory ('.' with no further dot) unless listed in ALLOWED_DOTFILES.
+    """
+    end = r'(?:/|\Z)'
+    reserved = '|'.join(sorted(RESERVED_NAMES))
+    allowed = '|'.join(re.escape(name) for name in ALLOWED_DOTFILES)
+    component = (
+        rf'(?!(?i:{reserved}){end})'
+        rf'(?!(?!(?:{allowed}){end})\.[^./]*{end})'
+        r'[a-zA-Z0-9._-]+'
+    )
+    return re.compile(rf'\A(?=.{{1,255}}\Z){component}(?:/{component})*\Z')
+
+
+_FILENAME_MATCH = _build_filename_re().match
+
+
+def _split_ignore_patterns(patterns: List[str]):
+    """
+    Classify fnmatch patterns by shape so most can be checked without regex.
+
+    Returns (names, prefixes, suffixes, infixes, others): literal patterns,
+    'head*', '*tail' and '*mid*' fragments, and patterns needing fnmatch.
+    """
+    names, prefixes, suffixes, infixes, others = set(), [], [], [], []
+
+    for pattern in patterns:
+        stars = pattern.count('*')
+        if '?' in pattern or '[' in pattern:
+            others.append(pattern)
+        elif stars == 0:
+            names.add(pattern)
+        elif stars == 1 and pattern.endswith('*'):
+            prefixes.append(pattern[:-1])
+        elif stars == 1 and pattern.startswith('*'):
+            suffixes.append(pattern[1:])
+        elif stars == 2 and pattern.startswith('*') and pattern.endswith('*'):
+            infixes.append(pattern[1:-1])
+        else:
+            others.append(pattern)
+
+    return frozenset(names), tuple(prefixes), tuple(suffixes), tuple(infixes), others
+
+
+# fnmatch.fnmatch() runs os.path.normcase() on name and pattern, which
+# folds case on Windows; mirror that so e.g. 'ID_RSA' is still ignored there
+_IGNORE_FOLD_CASE = os.path.normcase('A') == 'a'
+
+(
+    _IGNORE_NAMES,
+    _IGNORE_PREFIXES,
+    _IGNORE_SUFFIXES,
+    _IGNORE_INFIXES,
+    _IGNORE_OTHERS,
+) = _split_ignore_patterns(
+    [p.lower() for p in IGNORE_PATTERNS] if _IGNORE_FOLD_CASE else IGNORE_PATTERNS
+)
+
+# Remaining patterns translated once into a single alternation (each
+# fnmatch.translate() result is already anchored with \Z)
+_IGNORE_MATCH = re.compile(
+    '|'.join(f'(?:{fnmatch.translate(p)})' for p in _IGNORE_OTHERS),
+    re.IGNORECASE if _IGNORE_FOLD_CASE else 0,
+).match if _IGNORE_OTHERS else None
+
 
 def validate_project_id(project_id: str) -> str:
     """
@@ -66,9 +178,18 @@ def validate_project_id(project_id: str) -> str:
     if not project_id:
         raise ValidationError("project_id is required")
 
+    if not isinstance(project_id, str):
+        raise ValidationError("project_id must be a string")
+
+    return _validate_project_id(project_id)
+
+
+@functools.lru_cache(maxsize=4096)
+def _validate_project_id(project_id: str) -> str:
+    """Checks behind validate_project_id(); only accepted ids are cached."""
     project_id = project_id.strip()
 
-    if not VALID_PROJECT_ID.match(project_id):
+    if not _VALID_PROJECT_ID_MATCH(project_id):
         raise ValidationError(
             f"Invalid project_id format: must be 3-64 alphanumeric characters, "
             f"underscores, or hyphens. Got: {project_id!r}"
@@ -79,7 +200,7 @@ def validate_project_id(project_id: str) -> str:
             f"project_id cannot start with '-' or '.'. Got: {project_id!r}"
         )
 
-    if project_id.lower() in RESERVED_NAMES:
+    if _is_reserved_name(project_id):
         raise ValidationError(
             f"project_id cannot be a reserved name. Got: {project_id!r}"
         )
@@ -110,6 +231,15 @@ def validate_filename(filename: str) -> str:
     if not filename:
         raise ValidationError("filename is required")
 
+    if not isinstance(filename, str):
+        raise ValidationError("filename must be a string")
+
+    return _validate_filename(filename)
+
+
+@functools.lru_cache(maxsize=4096)
+def _validate_filename(filename: str) -> str:
+    """Checks behind validate_filename(); only accepted filenames are cached."""
     filename = filename.strip()
 
     # Normalize path separators to forward slash
@@ -121,15 +251,30 @@ def validate_filename(filename: str) -> str:
     if not filename:
         raise ValidationError("filename cannot be empty after normalization")
 
-    # Check for forbidden patterns
-    for pattern in FORBIDDEN_PATTERNS:
-        if pattern in filename:
+    # Format and every path component are checked in a single pass;
+    # _raise_invalid_filename() only runs to explain a rejection
+    if '..' in filename or not _FILENAME_MATCH(filename):
+        _raise_invalid_filename(filename)
+
+    # Check against ignore patterns (secrets, credentials, etc.)
+    if _matches_ignore_pattern(filename):
+        raise ValidationError(
+            f"File matches ignore pattern (secrets/credentials): {filename!r}"
+        )
+
+    return filename
+
+
+def _raise_invalid_filename(filename: str) -> None:
+    """Raise the specific error for a filename rejected by _FILENAME_MATCH."""
+    # Forbidden patterns are a security error, anything else outside
+    # VALID_FILENAME is a format error
+    if not _VALID_FILENAME_MATCH(filename) or '..' in filename:
+        forbidden = _FORBIDDEN_SEARCH(filename)
+        if forbidden:
             raise SecurityError(
-                f"Forbidden pattern in filename: {pattern!r}"
+                f"Forbidden pattern in filename: {forbidden.group(0)!r}"
             )
-
-    # Check regex pattern
-    if not VALID_FILENAME.match(filename):
         raise ValidationError(
             f"Invalid filename format: {filename!r}"
         )
@@ -139,43 +284,41 @@ def validate_filename(filename: str) -> str:
         if not part:
             raise ValidationError("Empty path component in filename")
 
-        if part.lower() in RESERVED_NAMES:
+        if _is_reserved_name(part):
             raise ValidationError(
                 f"Reserved name in path: {part!r}"
             )
 
-        if part.startswith('.') and part not in ('.gitignore', '.gitattributes'):
+        if part.startswith('.') and part not in ALLOWED_DOTFILES:
             # Allow common dotfiles but reject hidden directories
             if '.' not in part[1:]:  # It's a hidden dir like .git
                 raise ValidationError(
                     f"Hidden directory not allowed: {part!r}"
                 )
 
-    # Check against ignore patterns (secrets, credentials, etc.)
-    if _matches_ignore_pattern(filename):
-        raise ValidationError(
-            f"File matches ignore pattern (secrets/credentials): {filename!r}"
-        )
-
-    return filename
+    raise ValidationError(f"Invalid filename format: {filename!r}")
 
 
 def _matches_ignore_pattern(filename: str) -> bool:
-    """Check if filename matches any IGNORE_PATTERNS."""
-    path = Path(filename)
-
-    for pattern in IGNORE_PATTERNS:
-        # Check each part of the path
-        for part in path.parts:
-            if fnmatch.fnmatch(part, pattern):
-                return True
-
-        # Check full path
-        if fnmatch.fnmatch(filename, pattern):
-            return True
+    """
+    Check if filename matches any IGNORE_PATTERNS.
 
-        # Check filename only
-        if fnmatch.fnmatch(path.name, pattern):
+    Expects a filename already normalized by validate_filename() (forward
+    slashes, no empty components), so a plain split gives the path parts.
+    """
+    if _IGNORE_FOLD_CASE:
+        filename = filename.lower()
+
+    # Check each part of the path (the filename is the last part), then
+    # the full path
+    for candidate in (*filename.split('/'), filename):
+        if (
+            candidate in _IGNORE_NAMES
+            or candidate.startswith(_IGNORE_PREFIXES)
+            or candidate.endswith(_IGNORE_SUFFIXES)
+            or any(infix in candidate for infix in _IGNORE_INFIXES)
+            or (_IGNORE_MATCH is not None and _IGNORE_MATCH(candidate))
+        ):
             return True
 
     return False
@@ -189,8 +332,8 @@ def get_safe_staging_path(project_id: str, filename: str) -> Path:
     1. Validates project_id
     2. Validates filename
     3. Constructs path
-    4. Resolves and verifies within staging root
-    5. Checks for symlinks
+    4. Verifies it stays within the (cached, resolved) project staging root
+    5. Checks for symlinks (lstat, before anything is resolved)
 
     Args:
         project_id: Project identifier
@@ -207,39 +350,62 @@ def get_safe_staging_path(project_id: str, filename: str) -> Path:
     project_id = validate_project_id(project_id)
     filename = validate_filename(filename)
 
-    settings = get_settings()
-    staging_root = settings.data_dir / "staging"
-    project_staging = staging_root / project_id
+    project_staging = _resolved_project_staging(project_id)
 
-    # Construct target path
+    # validate_filename() already rejected '..', backslashes and leading
+    # slashes, so joining onto the resolved project root stays lexically
+    # inside it; the symlink walk below covers what the join cannot see
     target = project_staging / filename
 
-    # Resolve to absolute path
-    try:
-        resolved = target.resolve()
-    except (OSError, ValueError) as e:
-        raise SecurityError(f"Invalid path: {e}")
-
     # Verify path is within project staging
-    try:
-        resolved.relative_to(project_staging.resolve())
-    except ValueError:
+    if os.path.commonpath((project_staging, target)) != str(project_staging):
         raise SecurityError(
             f"Path traversal detected: {filename!r} escapes staging directory"
         )
 
-    # Check if any parent is a symlink (symlink attack prevention)
-    current = target
-    while current != staging_root:
-        if current.is_symlink():
+    # Check the project root and each component for symlinks (symlink attack
+    # prevention). Nothing has been resolved, so lstat still sees the links.
+    components = itertools.accumulate(
+        filename.split('/'), os.path.join, initial=str(project_staging)
+    )
+    for current in components:
+        try:
+            st = os.lstat(current)
+        except (FileNotFoundError, NotADirectoryError):
+            break  # Nothing below a missing component can exist yet
+        if stat.S_ISLNK(st.st_mode):
             raise SecurityError(
                 f"Symlink detected in path: {current}"
             )
-        current = current.parent
-        if current == current.parent:  # Reached root
-            break
 
-    return resolved
+    return target
+
+
+def nofollow_opener(path: str, flags: int) -> int:
+    """
+    Opener for open() that refuses a symlink at the final path component.
+
+    Closes the window between get_safe_staging_path()'s symlink check and
+    the actual write (no-op on platforms without O_NOFOLLOW).
+    """
+    return os.open(path, flags | getattr(os, "O_NOFOLLOW", 0), 0o666)
+
+
+@functools.lru_cache(maxsize=1)
+def _staging_root() -> Path:
+    """Return the absolute staging root, resolved once per process."""
+    return get_settings().data_dir.resolve() / "staging"
+
+
+@functools.lru_cache(maxsize=256)
+def _resolved_project_staging(project_id: str) -> Path:
+    """
+    Return absolute staging/{project_id}/ for an already validated project_id.
+
+    Only the data directory is resolved; the project directory itself is
+    joined lexically so the symlink walk still sees it if it is a symlink.
+    """
+    return _staging_root() / project_id
 
 
 def validate_vendor_id(vendor_id: str) -> str:
@@ -286,17 +452,15 @@ def validate_repo_url(repo_url: str) -> str:
 
     repo_url = repo_url.strip()
 
-    # Must be HTTPS GitHub URL
-    if not repo_url.startswith('https://github.com/'):
-        raise ValidationError(
-            "repo_url must be an HTTPS GitHub URL (https://github.com/...)"
-        )
-
-    # Basic format check
-    parts = repo_url.replace('https://github.com/', '').rstrip('/').split('/')
-    if len(parts) < 2:
+    if not _GITHUB_URL_MATCH(repo_url):
+        # Must be HTTPS GitHub URL
+        if not repo_url.startswith('https://github.com/'):
+            raise ValidationError(
+                "repo_url must be an HTTPS GitHub URL (https://github.com/...)"
+            )
         raise ValidationError(
-            "repo_url must include owner and repo name"
+            "repo_url must include owner and repo name "
+            "(https://github.com/owner/repo)"
         )
 
     return repo_url
@@ -315,21 +479,15 @@ def validate_snapshot_type(snapshot_type: str) -> str:
     Raises:
         ValidationError: If invalid
     """
-    valid_types = {
-        'file_metadata', 'imports', 'exports', 'functions', 'classes',
-        'connections', 'repo_metadata', 'security', 'quality',
-        'doc_metadata', 'doc_content', 'doc_analysis'
-    }
-
     if not snapshot_type:
         raise ValidationError("snapshot_type is required")
 
     snapshot_type = snapshot_type.strip().lower()
 
-    if snapshot_type not in valid_types:
+    if snapshot_type not in _VALID_SNAPSHOT_TYPES:
         raise ValidationError(
             f"Invalid snapshot_type: {snapshot_type!r}. "
-            f"Must be one of: {', '.join(sorted(valid_types))}"
+            f"Must be one of: {_VALID_SNAPSHOT_TYPES_STR}"
         )
 
     return snapshot_type
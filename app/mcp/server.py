@@ -9,13 +9,22 @@ the official mcp Python SDK with HTTP+SSE transport.
 from __future__ import annotations
 
 import json
+import logging
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
 from mcp.types import Tool, TextContent
 from starlette.applications import Starlette
 from starlette.routing import Route
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 
@@ -26,6 +35,7 @@ from app.mcp.tools import (
     handle_delete_project,
     handle_get_staging_info,
     handle_upload_to_staging,
+    handle_upload_to_staging_batch,
     handle_clear_staging,
     handle_get_project_manifest,
     handle_query_snapshots,
@@ -42,197 +52,325 @@ logger = get_logger("mcp.server")
 server = Server("snap-mcp")
 
 
+def _serialize(obj: Any) -> str:
+    """
+    Serialize a tool result to JSON text for the MCP response.
+
+    Uses orjson when installed (stdlib json otherwise). Output is compact
+    for machine consumers; indented only when debug logging is enabled.
+    Datetimes are written as isoformat() strings by either encoder, so
+    handlers can return them unconverted.
+    """
+    pretty = logger.isEnabledFor(logging.DEBUG)
+
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option, default=str).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; stdlib json handles these
+            pass
+
+    return json.dumps(obj, indent=2 if pretty else None, default=_json_default)
+
+
+def _json_default(obj: Any) -> str:
+    """stdlib json fallback: isoformat() for dates and datetimes (as orjson), else str()."""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return str(obj)
+
+
 # =============================================================================
 # Tool Definitions
 # =============================================================================
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """Return list of available MCP tools."""
-    return [
-        Tool(
-            name="process_github_repo",
-            description="Clone and analyze a GitHub repository. Creates snapshots for all code files with imports, exports, functions, classes, security issues, and more.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "repo_url": {
-                        "type": "string",
-                        "description": "GitHub repository URL (https://github.com/owner/repo)",
-                    },
-                    "project_id": {
-                        "type": "string",
-                        "description": "Unique project identifier (3-64 alphanumeric chars, underscores, hyphens)",
-                    },
-                    "vendor_id": {
-                        "type": "string",
-                        "description": "Your identifier for audit logging",
-                    },
-                    "branch": {
-                        "type": "string",
-                        "description": "Optional branch to clone (default: default branch)",
-                    },
+# Built once at import; list_tools() hands out a copy of this tuple
+_TOOLS: tuple[Tool, ...] = (
+    Tool(
+        name="process_github_repo",
+        description="Clone and analyze a GitHub repository. Creates snapshots for all code files with imports, exports, functions, classes, security issues, and more.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "repo_url": {
+                    "type": "string",
+                    "description": "GitHub repository URL (https://github.com/owner/repo)",
+                },
+                "project_id": {
+                    "type": "string",
+                    "description": "Unique project identifier (3-64 alphanumeric chars, underscores, hyphens)",
+                },
+                "vendor_id": {
+                    "type": "string",
+                    "description": "Your identifier for audit logging",
+                },
+                "branch": {
+                    "type": "string",
+                    "description": "Optional branch to clone (default: default branch)",
                 },
-                "required": ["repo_url", "project_id", "vendor_id"],
             },
-        ),
-        Tool(
-            name="process_local_project",
-            description="Analyze files previously uploaded to project staging area. Use upload_to_staging first to upload files.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier (must have files in staging)",
-                    },
-                    "vendor_id": {
-                        "type": "string",
-                        "description": "Your identifier for audit logging",
-                    },
+            "required": ["repo_url", "project_id", "vendor_id"],
+        },
+    ),
+    Tool(
+        name="process_local_project",
+        description="Analyze files previously uploaded to project staging area. Use upload_to_staging first to upload files.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier (must have files in staging)",
+                },
+                "vendor_id": {
+                    "type": "string",
+                    "description": "Your identifier for audit logging",
                 },
-                "required": ["project_id", "vendor_id"],
             },
-        ),
-        Tool(
-            name="get_project_notebook",
-            description="Retrieve the complete analysis notebook for a project, including all snapshots organized by type and file.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier",
-                    },
-                    "vendor_id": {
-                        "type": "string",
-                        "description": "Your identifier for audit logging",
-                    },
+            "required": ["project_id", "vendor_id"],
+        },
+    ),
+    Tool(
+        name="get_project_notebook",
+        description="Retrieve the complete analysis notebook for a project, including all snapshots organized by type and file.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
+                },
+                "vendor_id": {
+                    "type": "string",
+                    "description": "Your identifier for audit logging",
                 },
-                "required": ["project_id", "vendor_id"],
             },
-        ),
-        Tool(
-            name="delete_project",
-            description="Delete a project and all its snapshots. This is irreversible.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier to delete",
-                    },
+            "required": ["project_id", "vendor_id"],
+        },
+    ),
+    Tool(
+        name="delete_project",
+        description="Delete a project and all its snapshots. This is irreversible.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier to delete",
                 },
-                "required": ["project_id"],
             },
-        ),
-        Tool(
-            name="get_staging_info",
-            description="Get information about the staging area for a project, including list of uploaded files.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier",
-                    },
+            "required": ["project_id"],
+        },
+    ),
+    Tool(
+        name="get_staging_info",
+        description="Get information about the staging area for a project, including list of uploaded files.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
                 },
-                "required": ["project_id"],
             },
-        ),
-        Tool(
-            name="upload_to_staging",
-            description="Upload a file to the project staging area. Use this before process_local_project.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier",
-                    },
-                    "filename": {
-                        "type": "string",
-                        "description": "Relative filename (e.g., 'main.py' or 'src/utils.py')",
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "File content (text or base64-encoded)",
-                    },
-                    "encoding": {
-                        "type": "string",
-                        "enum": ["utf-8", "base64"],
-                        "description": "Content encoding: 'utf-8' for text, 'base64' for binary",
-                        "default": "utf-8",
-                    },
+            "required": ["project_id"],
+        },
+    ),
+    Tool(
+        name="upload_to_staging",
+        description="Upload a file to the project staging area. Use this before process_local_project.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
+                },
+                "filename": {
+                    "type": "string",
+                    "description": "Relative filename (e.g., 'main.py' or 'src/utils.py')",
+                },
+                "content": {
+                    "type": "string",
+                    "description": "File content (text or base64-encoded)",
+                },
+                "encoding": {
+                    "type": "string",
+                    "enum": ["utf-8", "base64"],
+                    "description": "Content encoding: 'utf-8' for text, 'base64' for binary",
+                    "default": "utf-8",
                 },
-                "required": ["project_id", "filename", "content"],
             },
-        ),
-        Tool(
-            name="clear_staging",
-            description="Clear all files from the project staging area.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier",
+            "required": ["project_id", "filename", "content"],
+        },
+    ),
+    Tool(
+        name="upload_to_staging_batch",
+        description="Upload several files to the project staging area in one call (max 100). Each file is validated like upload_to_staging; failures are reported per file.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
+                },
+                "files": {
+                    "type": "array",
+                    "description": "Files to upload",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "filename": {
+                                "type": "string",
+                                "description": "Relative filename (e.g., 'main.py' or 'src/utils.py')",
+                            },
+                            "content": {
+                                "type": "string",
+                                "description": "File content (text or base64-encoded)",
+                            },
+                            "encoding": {
+                                "type": "string",
+                                "enum": ["utf-8", "base64"],
+                                "description": "Content encoding: 'utf-8' for text, 'base64' for binary",
+                                "default": "utf-8",
+                            },
+                        },
+                        "required": ["filename", "content"],
                     },
                 },
-                "required": ["project_id"],
             },
-        ),
-        Tool(
-            name="get_project_manifest",
-            description="Get processing statistics for a project (files processed, snapshots created, etc.).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier",
-                    },
+            "required": ["project_id", "files"],
+        },
+    ),
+    Tool(
+        name="clear_staging",
+        description="Clear all files from the project staging area.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
                 },
-                "required": ["project_id"],
             },
-        ),
-        Tool(
-            name="query_snapshots",
-            description="Query snapshots by type or file. Use to find specific information like 'all security issues' or 'imports for main.py'.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "project_id": {
-                        "type": "string",
-                        "description": "Project identifier",
-                    },
-                    "snapshot_type": {
-                        "type": "string",
-                        "enum": [
-                            "file_metadata", "imports", "exports", "functions",
-                            "classes", "connections", "repo_metadata", "security",
-                            "quality", "doc_metadata", "doc_content", "doc_analysis"
-                        ],
-                        "description": "Filter by snapshot type",
-                    },
-                    "file_path": {
-                        "type": "string",
-                        "description": "Filter by source file path",
-                    },
+            "required": ["project_id"],
+        },
+    ),
+    Tool(
+        name="get_project_manifest",
+        description="Get processing statistics for a project (files processed, snapshots created, etc.). Pass the returned version as if_version to get status 'not_modified' while the manifest is unchanged.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
+                },
+                "if_version": {
+                    "type": "string",
+                    "description": "Version from a previous get_project_manifest response",
                 },
-                "required": ["project_id"],
             },
-        ),
-        Tool(
-            name="get_system_metrics",
-            description="Get overall system metrics including total projects, files processed, and snapshot statistics.",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
+            "required": ["project_id"],
+        },
+    ),
+    Tool(
+        name="query_snapshots",
+        description="Query snapshots by type or file. Use to find specific information like 'all security issues' or 'imports for main.py'. Results are paged; when has_more is true, call again with offset=next_offset.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "project_id": {
+                    "type": "string",
+                    "description": "Project identifier",
+                },
+                "snapshot_type": {
+                    "type": "string",
+                    "enum": [
+                        "file_metadata", "imports", "exports", "functions",
+                        "classes", "connections", "repo_metadata", "security",
+                        "quality", "doc_metadata", "doc_content", "doc_analysis"
+                    ],
+                    "description": "Filter by snapshot type",
+                },
+                "file_path": {
+                    "type": "string",
+                    "description": "Filter by source file path",
+                },
+                "limit": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 1000,
+                    "default": 1000,
+                    "description": "Maximum snapshots to return in this page",
+                },
+                "offset": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "default": 0,
+                    "description": "Snapshots to skip; use next_offset from the previous page",
+                },
             },
-        ),
-    ]
+            "required": ["project_id"],
+        },
+    ),
+    Tool(
+        name="get_system_metrics",
+        description="Get overall system metrics including total projects, files processed, and snapshot statistics.",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": [],
+        },
+    ),
+)
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """Return list of available MCP tools."""
+    return list(_TOOLS)
+
+
+# Tool name -> (handler, argument names it accepts). Arguments the client
+# omits are left out so the handler's own defaults apply.
+_HANDLERS: Dict[str, Tuple[Callable[..., Awaitable[Dict[str, Any]]], Tuple[str, ...]]] = {
+    "process_github_repo": (
+        handle_process_github_repo,
+        ("repo_url", "project_id", "vendor_id", "branch"),
+    ),
+    "process_local_project": (
+        handle_process_local_project,
+        ("project_id", "vendor_id"),
+    ),
+    "get_project_notebook": (
+        handle_get_project_notebook,
+        ("project_id", "vendor_id"),
+    ),
+    "delete_project": (handle_delete_project, ("project_id",)),
+    "get_staging_info": (handle_get_staging_info, ("project_id",)),
+    "upload_to_staging": (
+        handle_upload_to_staging,
+        ("project_id", "filename", "content", "encoding"),
+    ),
+    "upload_to_staging_batch": (
+        handle_upload_to_staging_batch,
+        ("project_id", "files"),
+    ),
+    "clear_staging": (handle_clear_staging, ("project_id",)),
+    "get_project_manifest": (
+        handle_get_project_manifest,
+        ("project_id", "if_version"),
+    ),
+    "query_snapshots": (
+        handle_query_snapshots,
+        ("project_id", "snapshot_type", "file_path", "limit", "offset"),
+    ),
+    "get_system_metrics": (handle_get_system_metrics, ()),
+}
 
 
 @server.call_tool()
@@ -240,74 +378,21 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Handle tool calls from MCP clients."""
     logger.info("MCP tool call: %s", name, extra={"arguments": arguments})
 
-    try:
-        if name == "process_github_repo":
-            result = await handle_process_github_repo(
-                repo_url=arguments["repo_url"],
-                project_id=arguments["project_id"],
-                vendor_id=arguments["vendor_id"],
-                branch=arguments.get("branch"),
-            )
-
-        elif name == "process_local_project":
-            result = await handle_process_local_project(
-                project_id=arguments["project_id"],
-                vendor_id=arguments["vendor_id"],
-            )
-
-        elif name == "get_project_notebook":
-            result = await handle_get_project_notebook(
-                project_id=arguments["project_id"],
-                vendor_id=arguments["vendor_id"],
-            )
-
-        elif name == "delete_project":
-            result = await handle_delete_project(
-                project_id=arguments["project_id"],
-            )
-
-        elif name == "get_staging_info":
-            result = await handle_get_staging_info(
-                project_id=arguments["project_id"],
-            )
-
-        elif name == "upload_to_staging":
-            result = await handle_upload_to_staging(
-                project_id=arguments["project_id"],
-                filename=arguments["filename"],
-                content=arguments["content"],
-                encoding=arguments.get("encoding", "utf-8"),
-            )
-
-        elif name == "clear_staging":
-            result = await handle_clear_staging(
-                project_id=arguments["project_id"],
-            )
-
-        elif name == "get_project_manifest":
-            result = await handle_get_project_manifest(
-                project_id=arguments["project_id"],
-            )
-
-        elif name == "query_snapshots":
-            result = await handle_query_snapshots(
-                project_id=arguments["project_id"],
-                snapshot_type=arguments.get("snapshot_type"),
-                file_path=arguments.get("file_path"),
-            )
+    entry = _HANDLERS.get(name)
+    if entry is None:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": f"Unknown tool: {name}"}),
+        )]
 
-        elif name == "get_system_metrics":
-            result = await handle_get_system_metrics()
+    handler, keys = entry
 
-        else:
-            return [TextContent(
-                type="text",
-                text=json.dumps({"error": f"Unknown tool: {name}"}),
-            )]
+    try:
+        result = await handler(**{k: arguments[k] for k in keys if k in arguments})
 
         return [TextContent(
             type="text",
-            text=json.dumps(result, indent=2, default=str),
+            text=_serialize(result),
         )]
 
     except ValidationError as e:
@@ -343,6 +428,14 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 # HTTP+SSE Transport
 # =============================================================================
 
+# Static health check payload, encoded once
+_HEALTH_BODY = json.dumps({
+    "status": "healthy",
+    "service": "snap-mcp",
+    "version": "1.0.0",
+}, separators=(",", ":")).encode("utf-8")
+
+
 def create_app() -> Starlette:
     """
     Create Starlette application with MCP SSE transport.
@@ -375,11 +468,7 @@ def create_app() -> Starlette:
 
     async def health_check(_request):
         """Health check endpoint."""
-        return JSONResponse({
-            "status": "healthy",
-            "service": "snap-mcp",
-            "version": "1.0.0",
-        })
+        return Response(_HEALTH_BODY, media_type="application/json")
 
     # Configure CORS middleware
     settings = get_settings()
@@ -390,7 +479,15 @@ def create_app() -> Starlette:
             allow_origins=origins,
             allow_credentials=origins != ["*"],
             allow_methods=["*"],
-            allow_headers=["*"],
+            # Static list (not "*") so preflight responses are constant and
+            # browsers can cache them for max_age seconds
+            allow_headers=[
+                "content-type",
+                "authorization",
+                "mcp-session-id",
+                "mcp-protocol-version",
+            ],
+            max_age=86400,
         )
     ]
 
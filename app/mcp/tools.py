@@ -8,9 +8,17 @@ JSON-serializable results for MCP responses.
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import binascii
+import logging
+import os
+import secrets
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
 from datetime import datetime
 
 from app.mcp.security import (
@@ -20,6 +28,7 @@ from app.mcp.security import (
     validate_filename,
     validate_snapshot_type,
     get_safe_staging_path,
+    nofollow_opener,
     SecurityError,
     ValidationError,
 )
@@ -33,12 +42,31 @@ from app.ingest.local_loader import (
 
 logger = get_logger("mcp.tools")
 
+# Upload validation and disk writes run here instead of on the event loop
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="snap-upload")
+
+# Created on first use when settings.staging_stat_workers > 0
+_STAT_POOL: Optional[ThreadPoolExecutor] = None
+
+# Set once app.main.startup() has succeeded in this process
+_started = False
+
 
 class ToolError(Exception):
     """Raised when a tool execution fails."""
     pass
 
 
+def _ensure_started() -> None:
+    """Run app.main.startup() once per process; later calls only check a flag."""
+    global _started
+    if not _started:
+        from app.main import startup
+
+        startup()
+        _started = True
+
+
 # =============================================================================
 # Core Tools
 # =============================================================================
@@ -73,10 +101,10 @@ async def handle_process_github_repo(
         "branch": branch,
     })
 
-    # Import here to avoid circular imports and ensure startup() was called
-    from app.main import process_project, startup
+    # Import here to avoid circular imports
+    from app.main import process_project
 
-    startup()
+    _ensure_started()
 
     try:
         manifest = process_project(
@@ -121,17 +149,19 @@ async def handle_process_local_project(
         "vendor_id": vendor_id,
     })
 
-    from app.main import process_project, startup
+    from app.main import process_project
 
-    startup()
+    _ensure_started()
 
     staging_path = get_project_staging_path(project_id)
 
-    # Check staging has files
-    files = list(staging_path.rglob("*"))
-    files = [f for f in files if f.is_file()]
+    # Check staging has files (stops at the first one found); in-flight
+    # upload temporaries do not count
+    has_files = any(
+        f.is_file() and not _is_staged_tmp(f.name) for f in staging_path.rglob("*")
+    )
 
-    if not files:
+    if not has_files:
         raise ToolError(
             f"No files in staging area. Upload files first using upload_to_staging."
         )
@@ -146,7 +176,7 @@ async def handle_process_local_project(
         return {
             "status": "completed",
             "project_id": project_id,
-            "files_processed": len(files),
+            "files_processed": manifest["stats"]["files_processed"],
             "manifest": manifest,
         }
 
@@ -180,9 +210,9 @@ async def handle_get_project_notebook(
         "vendor_id": vendor_id,
     })
 
-    from app.main import get_project_notebook, startup
+    from app.main import get_project_notebook
 
-    startup()
+    _ensure_started()
 
     try:
         notebook = get_project_notebook(project_id, vendor_id)
@@ -219,9 +249,9 @@ async def handle_delete_project(
         "project_id": project_id,
     })
 
-    from app.main import delete_project, startup
+    from app.main import delete_project
 
-    startup()
+    _ensure_started()
 
     try:
         delete_project(project_id)
@@ -261,28 +291,78 @@ async def handle_get_staging_info(
     """
     project_id = validate_project_id(project_id)
 
-    logger.info("MCP tool: get_staging_info", extra={
-        "project_id": project_id,
-    })
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("MCP tool: get_staging_info", extra={
+            "project_id": project_id,
+        })
 
     staging_path = get_project_staging_path(project_id)
+    stat_workers = get_settings().staging_stat_workers
 
     files = []
     total_size = 0
 
-    for path in staging_path.rglob("*"):
-        if path.is_file() and not path.is_symlink():
-            try:
-                stat = path.stat()
-                rel_path = path.relative_to(staging_path)
-                files.append({
-                    "name": str(rel_path),
-                    "size": stat.st_size,
-                    "modified_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                })
-                total_size += stat.st_size
-            except (OSError, ValueError):
+    # With stat_workers set, files are only collected during the walk and
+    # their lstat calls are fanned out over _STAT_POOL afterwards
+    deferred = []
+
+    # Iterative scandir walk: DirEntry caches the file type from readdir
+    # and the lstat result, so each entry costs at most one stat call.
+    # Symlinks (to files or directories) are skipped entirely.
+    staging_root = str(staging_path)
+    prefix_len = len(staging_root) + 1  # entry.path[prefix_len:] is relative
+    pending = deque([staging_root])
+
+    # Bound once outside the loop
+    append_file = files.append
+    defer_file = deferred.append
+    fromtimestamp = datetime.fromtimestamp
+
+    while pending:
+        try:
+            entries = os.scandir(pending.popleft())
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if _is_staged_tmp(entry.name):
+                            continue
+                        if stat_workers:
+                            defer_file(entry.path)
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        size = stat.st_size
+                        append_file({
+                            "name": entry.path[prefix_len:],
+                            "size": size,
+                            "modified_at": fromtimestamp(stat.st_mtime).isoformat(),
+                        })
+                        total_size += size
+                except OSError:
+                    continue
+
+    if deferred:
+        loop = asyncio.get_running_loop()
+        pool = _get_stat_pool(stat_workers)
+        stats = await asyncio.gather(
+            *(loop.run_in_executor(pool, _lstat_or_none, path) for path in deferred)
+        )
+
+        for path, stat in zip(deferred, stats):
+            if stat is None:
                 continue
+            size = stat.st_size
+            append_file({
+                "name": path[prefix_len:],
+                "size": size,
+                "modified_at": fromtimestamp(stat.st_mtime).isoformat(),
+            })
+            total_size += size
 
     return {
         "status": "success",
@@ -294,6 +374,22 @@ async def handle_get_staging_info(
     }
 
 
+def _get_stat_pool(workers: int) -> ThreadPoolExecutor:
+    """Return the staging stat pool, creating it on first use."""
+    global _STAT_POOL
+    if _STAT_POOL is None:
+        _STAT_POOL = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snap-stat")
+    return _STAT_POOL
+
+
+def _lstat_or_none(path: str) -> Optional[os.stat_result]:
+    """lstat() a staged file, or None if it vanished or cannot be read."""
+    try:
+        return os.lstat(path)
+    except OSError:
+        return None
+
+
 async def handle_upload_to_staging(
     project_id: str,
     filename: str,
@@ -312,23 +408,82 @@ async def handle_upload_to_staging(
     Returns:
         Upload confirmation with file path
     """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _UPLOAD_POOL,
+        _upload_to_staging_sync,
+        project_id,
+        filename,
+        content,
+        encoding,
+    )
+
+
+def _upload_to_staging_sync(
+    project_id: str,
+    filename: str,
+    content: str,
+    encoding: str,
+) -> Dict[str, Any]:
+    """Validate, decode and write one upload (runs on _UPLOAD_POOL)."""
     project_id = validate_project_id(project_id)
     filename = validate_filename(filename)
 
-    logger.info("MCP tool: upload_to_staging", extra={
-        "project_id": project_id,
-        "filename": filename,
-        "encoding": encoding,
-    })
+    # The size bounds below measure content before any decode touches it
+    if not isinstance(content, str):
+        raise ValidationError("content must be a string")
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("MCP tool: upload_to_staging", extra={
+            "project_id": project_id,
+            "filename": filename,
+            "encoding": encoding,
+        })
 
     # Get safe path (validates and prevents traversal)
     safe_path = get_safe_staging_path(project_id, filename)
 
+    settings = get_settings()
+    max_size = settings.limits.max_code_file_bytes
+
+    # Reject oversized uploads before decoding or encoding anything:
+    # base64 gives an upper bound (exact for standard or line-wrapped
+    # input), utf-8 a lower bound of one byte per character
+    if encoding == "base64":
+        estimate = _base64_decoded_size(content)
+    elif encoding == "utf-8":
+        estimate = len(content)
+    else:
+        estimate = 0
+
+    if estimate > max_size:
+        raise ValidationError(
+            f"File too large: {estimate} bytes. Max: {max_size} bytes"
+        )
+
+    # Large canonical base64 is decoded straight into the file
+    if encoding == "base64" and len(content) > _B64_STREAM_THRESHOLD:
+        if _canonical_base64_size(content) is not None:
+            try:
+                size = _write_staged_base64(safe_path, content, max_size)
+            except OSError as e:
+                raise ToolError(f"Failed to write file: {e}")
+
+            if size is not None:
+                return {
+                    "status": "uploaded",
+                    "project_id": project_id,
+                    "filename": filename,
+                    "path": f"staging/{project_id}/{filename}",
+                    "size": size,
+                }
+
     # Decode content
     if encoding == "base64":
         try:
-            file_content = base64.b64decode(content)
-        except Exception as e:
+            # Accepts ASCII str directly; no intermediate bytes copy
+            file_content = binascii.a2b_base64(content)
+        except (TypeError, ValueError) as e:
             raise ValidationError(f"Invalid base64 content: {e}")
     elif encoding == "utf-8":
         file_content = content.encode("utf-8")
@@ -336,20 +491,13 @@ async def handle_upload_to_staging(
         raise ValidationError(f"Invalid encoding: {encoding}. Use 'utf-8' or 'base64'")
 
     # Check file size limits
-    settings = get_settings()
-    max_size = settings.limits.max_code_file_bytes
-
     if len(file_content) > max_size:
         raise ValidationError(
             f"File too large: {len(file_content)} bytes. Max: {max_size} bytes"
         )
 
-    # Create parent directories and write file
-    safe_path.parent.mkdir(parents=True, exist_ok=True)
-
     try:
-        with open(safe_path, "wb") as f:
-            f.write(file_content)
+        _write_staged_file(safe_path, file_content)
     except OSError as e:
         raise ToolError(f"Failed to write file: {e}")
 
@@ -357,11 +505,218 @@ async def handle_upload_to_staging(
         "status": "uploaded",
         "project_id": project_id,
         "filename": filename,
-        "path": str(safe_path.relative_to(settings.data_dir)),
+        "path": f"staging/{project_id}/{filename}",
         "size": len(file_content),
     }
 
 
+# Upper bound on files accepted by one upload_to_staging_batch call
+MAX_BATCH_FILES = 100
+
+
+async def handle_upload_to_staging_batch(
+    project_id: str,
+    files: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Upload several files to project staging area in one call.
+
+    Each file goes through the same validation and write path as
+    upload_to_staging; files are processed concurrently on the upload pool.
+    A rejected file does not stop the others, its entry carries the error.
+
+    Args:
+        project_id: Project identifier
+        files: List of {"filename", "content", "encoding"} objects
+            ("encoding" is optional and defaults to "utf-8")
+
+    Returns:
+        Per-file results with uploaded/failed counts
+    """
+    project_id = validate_project_id(project_id)
+
+    if not files:
+        raise ValidationError("files is required")
+
+    if len(files) > MAX_BATCH_FILES:
+        raise ValidationError(
+            f"Too many files: {len(files)}. Max: {MAX_BATCH_FILES} per batch"
+        )
+
+    for entry in files:
+        if not isinstance(entry, dict) or not isinstance(entry.get("content"), str):
+            raise ValidationError(
+                "Each file must be an object with 'filename' and string 'content'"
+            )
+
+    logger.info("MCP tool: upload_to_staging_batch", extra={
+        "project_id": project_id,
+        "file_count": len(files),
+    })
+
+    loop = asyncio.get_running_loop()
+    outcomes = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                _UPLOAD_POOL,
+                _upload_to_staging_sync,
+                project_id,
+                entry.get("filename"),
+                entry["content"],
+                entry.get("encoding", "utf-8"),
+            )
+            for entry in files
+        ),
+        return_exceptions=True,
+    )
+
+    results = []
+    failed = 0
+
+    for entry, outcome in zip(files, outcomes):
+        if not isinstance(outcome, Exception):
+            results.append(outcome)
+            continue
+
+        if isinstance(outcome, ValidationError):
+            error = "validation_error"
+        elif isinstance(outcome, SecurityError):
+            error = "security_error"
+        elif isinstance(outcome, ToolError):
+            error = "tool_error"
+        else:
+            error = "internal_error"
+
+        logger.warning(f"upload_to_staging_batch: {error} for {entry.get('filename')!r}: {outcome}")
+        failed += 1
+        results.append({
+            "status": "error",
+            "filename": entry.get("filename"),
+            "error": error,
+            "message": str(outcome),
+        })
+
+    return {
+        "status": "completed" if not failed else "partial",
+        "project_id": project_id,
+        "uploaded": len(files) - failed,
+        "failed": failed,
+        "files": results,
+    }
+
+
+# base64 uploads longer than this many characters are decoded in chunks of
+# _B64_CHUNK characters (a multiple of 4, so chunks end on quantum boundaries)
+_B64_STREAM_THRESHOLD = 1 << 20
+_B64_CHUNK = 1 << 20
+
+
+def _base64_decoded_size(content: str) -> int:
+    """
+    Decoded size of base64 text, not counting line breaks or spaces.
+
+    Exact for standard and line-wrapped base64; never below the real size,
+    since anything else the lenient decoder skips is still counted.
+    """
+    chars = len(content) - content.count("\n") - content.count("\r") - content.count(" ")
+    tail = content[-8:].rstrip()
+    padding = len(tail) - len(tail.rstrip("="))
+    return (chars - padding) * 3 // 4
+
+
+def _canonical_base64_size(content: str) -> Optional[int]:
+    """Decoded size if content can be strict base64, else None."""
+    if len(content) % 4:
+        return None
+
+    padding = 2 if content.endswith("==") else 1 if content.endswith("=") else 0
+    return len(content) // 4 * 3 - padding
+
+
+def _write_staged_base64(path: Path, content: str, max_size: int) -> Optional[int]:
+    """
+    Decode strict base64 into a validated staging path chunk by chunk.
+
+    Peak memory is one chunk rather than the whole decoded file. Returns the
+    decoded size. The limit is enforced on bytes actually decoded, so it is
+    exact however the input is laid out. Input that is not strict base64
+    leaves an existing file untouched and returns None; the caller then
+    falls back to the lenient full decode.
+    """
+    last_start = len(content) - _B64_CHUNK
+    written = 0
+
+    try:
+        with _open_staged_tmp(path) as f:
+            for start in range(0, len(content), _B64_CHUNK):
+                chunk = content[start:start + _B64_CHUNK]
+                # Padding is only valid in the final chunk
+                if start < last_start and chunk.endswith("="):
+                    raise binascii.Error("Excess data after padding")
+                written += f.write(binascii.a2b_base64(chunk, strict_mode=True))
+
+                # Every chunk so far was strict, so any decode yields at least this much
+                if written > max_size:
+                    raise ValidationError(
+                        f"File too large: {_canonical_base64_size(content)} bytes. "
+                        f"Max: {max_size} bytes"
+                    )
+    except ValueError:
+        # binascii.Error, or non-ASCII characters in content
+        return None
+
+    return written
+
+
+def _write_staged_file(path: Path, data: bytes) -> None:
+    """Write data to a validated staging path, replacing it atomically."""
+    with _open_staged_tmp(path) as f:
+        f.write(data)
+
+
+# Temporary upload names: ".upload-<16 hex>.tmp". validate_filename() never
+# accepts a hidden component like this, so the shape cannot clash with a
+# real staged file; the ".tmp" suffix also keeps leftovers out of ingestion
+_STAGED_TMP_PREFIX = ".upload-"
+_STAGED_TMP_SUFFIX = ".tmp"
+
+
+def _is_staged_tmp(name: str) -> bool:
+    """True for a basename produced by _open_staged_tmp()."""
+    return name.startswith(_STAGED_TMP_PREFIX) and name.endswith(_STAGED_TMP_SUFFIX)
+
+
+@contextmanager
+def _open_staged_tmp(path: Path) -> Iterator[BinaryIO]:
+    """
+    Open a temporary sibling of a validated staging path for writing.
+
+    On a clean exit the temporary file is moved over path with os.replace(),
+    so readers and concurrent uploads of the same name only ever see a
+    complete file; on error it is removed and path is left as it was.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Random per write (uploads on different threads of one process must
+    # not share a name) and independent of path.name, so a basename at the
+    # 255-character limit still leaves room for the temporary name
+    tmp_path = path.with_name(
+        f"{_STAGED_TMP_PREFIX}{secrets.token_hex(8)}{_STAGED_TMP_SUFFIX}"
+    )
+    f = open(tmp_path, "xb", opener=nofollow_opener)
+
+    try:
+        with f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
 async def handle_clear_staging(
     project_id: str,
 ) -> Dict[str, Any]:
@@ -380,13 +735,7 @@ async def handle_clear_staging(
         "project_id": project_id,
     })
 
-    staging_path = get_project_staging_path(project_id)
-
-    # Count files before deletion
-    files = list(staging_path.rglob("*"))
-    file_count = len([f for f in files if f.is_file()])
-
-    delete_project_staging(project_id)
+    file_count = delete_project_staging(project_id)
 
     return {
         "status": "cleared",
@@ -401,32 +750,50 @@ async def handle_clear_staging(
 
 async def handle_get_project_manifest(
     project_id: str,
+    if_version: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Get processing statistics for a project.
 
+    Every response carries the manifest "version". Passing it back as
+    if_version returns {"status": "not_modified"} without the manifest
+    while the manifest is unchanged.
+
     Args:
         project_id: Project identifier
+        if_version: Optional version from a previous response
 
     Returns:
-        Project manifest with processing stats
+        Project manifest with processing stats, or a not_modified marker
     """
     project_id = validate_project_id(project_id)
 
-    logger.info("MCP tool: get_project_manifest", extra={
-        "project_id": project_id,
-    })
+    if if_version is not None and not isinstance(if_version, str):
+        raise ValidationError("if_version must be a string")
 
-    from app.main import get_project_manifest, startup
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("MCP tool: get_project_manifest", extra={
+            "project_id": project_id,
+        })
 
-    startup()
+    from app.main import get_project_manifest_versioned
+
+    _ensure_started()
 
     try:
-        manifest = get_project_manifest(project_id)
+        version, manifest = get_project_manifest_versioned(project_id, if_version)
+
+        if manifest is None:
+            return {
+                "status": "not_modified",
+                "project_id": project_id,
+                "version": version,
+            }
 
         return {
             "status": "success",
             "project_id": project_id,
+            "version": version,
             "manifest": manifest,
         }
 
@@ -438,65 +805,92 @@ async def handle_get_project_manifest(
         raise ToolError(f"Failed to retrieve manifest: {e}")
 
 
+# Page size bounds for query_snapshots
+DEFAULT_QUERY_LIMIT = 1000
+MAX_QUERY_LIMIT = 1000
+
+
 async def handle_query_snapshots(
     project_id: str,
     snapshot_type: Optional[str] = None,
     file_path: Optional[str] = None,
+    limit: int = DEFAULT_QUERY_LIMIT,
+    offset: int = 0,
 ) -> Dict[str, Any]:
     """
     Query snapshots by type or file.
 
+    Results are paged: at most `limit` snapshots starting at `offset`.
+    When "has_more" is true, call again with offset set to "next_offset".
+
     Args:
         project_id: Project identifier
         snapshot_type: Optional filter by snapshot type (e.g., "security", "imports")
         file_path: Optional filter by source file path
+        limit: Page size (1 to MAX_QUERY_LIMIT)
+        offset: Number of snapshots to skip
 
     Returns:
-        List of matching snapshots
+        One page of matching snapshots
     """
     project_id = validate_project_id(project_id)
 
     if snapshot_type:
         snapshot_type = validate_snapshot_type(snapshot_type)
 
-    logger.info("MCP tool: query_snapshots", extra={
-        "project_id": project_id,
-        "snapshot_type": snapshot_type,
-        "file_path": file_path,
-    })
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_QUERY_LIMIT:
+        raise ValidationError(f"limit must be an integer between 1 and {MAX_QUERY_LIMIT}")
+
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ValidationError("offset must be a non-negative integer")
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("MCP tool: query_snapshots", extra={
+            "project_id": project_id,
+            "snapshot_type": snapshot_type,
+            "file_path": file_path,
+            "limit": limit,
+            "offset": offset,
+        })
+
+    from app.storage.snapshot_repo import get_snapshot_repo
 
-    from app.main import startup
-    from app.storage.snapshot_repo import SnapshotRepository
+    _ensure_started()
 
-    startup()
+    repo = get_snapshot_repo()
 
-    repo = SnapshotRepository()
+    # Fetch one extra row to learn whether another page exists
+    page = {"limit": limit + 1, "offset": offset}
 
     try:
         if file_path and snapshot_type:
             # Get specific snapshot for file and type
-            snapshots = repo.get_by_file(project_id, file_path)
-            snapshots = [s for s in snapshots if s.snapshot_type == snapshot_type]
+            snapshots = repo.get_by_file_and_type(project_id, file_path, snapshot_type, **page)
         elif file_path:
             # Get all snapshots for file
-            snapshots = repo.get_by_file(project_id, file_path)
+            snapshots = repo.get_by_file(project_id, file_path, **page)
         elif snapshot_type:
             # Get all snapshots of type
-            snapshots = repo.get_by_type(project_id, snapshot_type)
+            snapshots = repo.get_by_type(project_id, snapshot_type, **page)
         else:
             # Get all project snapshots
-            snapshots = repo.get_by_project(project_id)
+            snapshots = repo.get_by_project(project_id, **page)
 
-        # Convert to dicts
-        result = []
-        for s in snapshots:
-            result.append({
+        has_more = len(snapshots) > limit
+        if has_more:
+            del snapshots[limit:]
+
+        result = [
+            {
                 "snapshot_id": s.snapshot_id,
                 "snapshot_type": s.snapshot_type,
                 "source_file": s.source_file,
                 "field_values": s.field_values,
-                "created_at": s.created_at.isoformat(),
-            })
+                # Serialized to ISO 8601 by the MCP response encoder
+                "created_at": s.created_at,
+            }
+            for s in snapshots
+        ]
 
         return {
             "status": "success",
@@ -506,6 +900,10 @@ async def handle_query_snapshots(
                 "file_path": file_path,
             },
             "count": len(result),
+            "limit": limit,
+            "offset": offset,
+            "has_more": has_more,
+            "next_offset": offset + len(result) if has_more else None,
             "snapshots": result,
         }
 
@@ -526,9 +924,9 @@ async def handle_get_system_metrics() -> Dict[str, Any]:
     """
     logger.info("MCP tool: get_system_metrics")
 
-    from app.main import get_metrics, startup
+    from app.main import get_metrics
 
-    startup()
+    _ensure_started()
 
     try:
         metrics = get_metrics()
@@ -536,7 +934,7 @@ async def handle_get_system_metrics() -> Dict[str, Any]:
         return {
             "status": "success",
             "metrics": metrics,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         }
 
     except Exception as e:
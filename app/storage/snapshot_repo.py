@@ -15,6 +15,7 @@ from dataclasses import dataclass
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from uuid import uuid4
+import threading
 import yaml
 import json
 
@@ -37,7 +38,7 @@ class FieldConfig:
     required: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SnapshotRecord:
     snapshot_id: str
     project_id: str
@@ -234,17 +235,27 @@ class SnapshotRepository:
                 created_at=row[4]
             )
 
-    def get_by_project(self, project_id: str) -> List[SnapshotRecord]:
-        """Retrieve all snapshots for project_id in chronological order."""
+    def get_by_project(
+        self,
+        project_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[SnapshotRecord]:
+        """
+        Retrieve snapshots for project_id in chronological order.
+
+        limit/offset page through the results; limit=None returns all rows.
+        """
         with db_session() as session:
             result = session.execute(
                 text("""
                     SELECT snapshot_id, snapshot_type, source_file, field_values, created_at 
                     FROM snapshot_notebooks 
                     WHERE project_id = :pid
-                    ORDER BY created_at ASC
+                    ORDER BY created_at ASC, snapshot_id ASC
+                    LIMIT :limit OFFSET :offset
                 """),
-                {"pid": project_id}
+                {"pid": project_id, "limit": limit, "offset": offset}
             )
             rows = result.fetchall()
 
@@ -260,7 +271,13 @@ class SnapshotRepository:
                 for row in rows
             ]
 
-    def get_by_file(self, project_id: str, source_file: str) -> List[SnapshotRecord]:
+    def get_by_file(
+        self,
+        project_id: str,
+        source_file: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[SnapshotRecord]:
         """
         Retrieve all snapshots for a specific file.
         
@@ -269,6 +286,8 @@ class SnapshotRepository:
         Args:
             project_id: Project identifier
             source_file: Source file path
+            limit: Maximum rows to return (None for all)
+            offset: Rows to skip
         
         Returns:
             List of SnapshotRecords for this file
@@ -280,8 +299,9 @@ class SnapshotRepository:
                     FROM snapshot_notebooks 
                     WHERE project_id = :pid AND source_file = :sf
                     ORDER BY snapshot_type ASC
+                    LIMIT :limit OFFSET :offset
                 """),
-                {"pid": project_id, "sf": source_file}
+                {"pid": project_id, "sf": source_file, "limit": limit, "offset": offset}
             )
             rows = result.fetchall()
 
@@ -297,7 +317,62 @@ class SnapshotRepository:
                 for row in rows
             ]
 
-    def get_by_type(self, project_id: str, snapshot_type: str) -> List[SnapshotRecord]:
+    def get_by_file_and_type(
+        self,
+        project_id: str,
+        source_file: str,
+        snapshot_type: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[SnapshotRecord]:
+        """
+        Retrieve the snapshot of one type for a specific file.
+
+        Served by the UNIQUE (project_id, source_file, snapshot_type) index,
+        so at most one row comes back.
+
+        Args:
+            project_id: Project identifier
+            source_file: Source file path
+            snapshot_type: One of 12 categories
+            limit: Maximum rows to return (None for all)
+            offset: Rows to skip
+
+        Returns:
+            List with the matching SnapshotRecord, or empty
+        """
+        with db_session() as session:
+            result = session.execute(
+                text("""
+                    SELECT snapshot_id, field_values, created_at
+                    FROM snapshot_notebooks
+                    WHERE project_id = :pid AND source_file = :sf AND snapshot_type = :st
+                    LIMIT :limit OFFSET :offset
+                """),
+                {"pid": project_id, "sf": source_file, "st": snapshot_type,
+                 "limit": limit, "offset": offset}
+            )
+            rows = result.fetchall()
+
+            return [
+                SnapshotRecord(
+                    snapshot_id=row[0],
+                    project_id=project_id,
+                    snapshot_type=snapshot_type,
+                    source_file=source_file,
+                    field_values=row[1],
+                    created_at=row[2]
+                )
+                for row in rows
+            ]
+
+    def get_by_type(
+        self,
+        project_id: str,
+        snapshot_type: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[SnapshotRecord]:
         """
         Retrieve all snapshots of a specific type across project.
         
@@ -306,6 +381,8 @@ class SnapshotRepository:
         Args:
             project_id: Project identifier
             snapshot_type: One of 12 categories
+            limit: Maximum rows to return (None for all)
+            offset: Rows to skip
         
         Returns:
             List of SnapshotRecords matching type
@@ -317,8 +394,9 @@ class SnapshotRepository:
                     FROM snapshot_notebooks 
                     WHERE project_id = :pid AND snapshot_type = :stype
                     ORDER BY source_file ASC
+                    LIMIT :limit OFFSET :offset
                 """),
-                {"pid": project_id, "stype": snapshot_type}
+                {"pid": project_id, "stype": snapshot_type, "limit": limit, "offset": offset}
             )
             rows = result.fetchall()
 
@@ -393,3 +471,17 @@ class SnapshotRepository:
             })
             
             return deleted_count
+
+
+_REPO: SnapshotRepository | None = None
+_repo_lock = threading.Lock()
+
+
+def get_snapshot_repo() -> SnapshotRepository:
+    """Return the process-wide SnapshotRepository, creating it on first use."""
+    global _REPO
+    if _REPO is None:
+        with _repo_lock:
+            if _REPO is None:
+                _REPO = SnapshotRepository()
+    return _REPO